@@ -1,7 +1,13 @@
 """Block data endpoints."""
 
 from fastapi import APIRouter, HTTPException
-from ..models.blocks import BlockListResponse, BlockCodeResponse, BlockInfo
+from fastapi.responses import ORJSONResponse, Response
+from ..models.blocks import (
+    BlockListResponse,
+    BlockCodeResponse,
+    BlockCodeBatchRequest,
+    BlockCodeBatchResponse,
+)
 
 router = APIRouter()
 
@@ -18,15 +24,10 @@ async def get_blocks():
     if _data_service is None or not _data_service.is_ready():
         raise HTTPException(status_code=503, detail="Service not ready")
 
-    df = _data_service.get_all_blocks()
-    blocks = [
-        BlockInfo(**row)
-        for row in df.to_dicts()
-    ]
-    return BlockListResponse(
-        blocks=blocks,
-        metric_columns=_data_service.metric_columns,
-        total_blocks=len(blocks),
+    # Payload is serialized once at load time (response_model is docs only)
+    return Response(
+        content=_data_service.get_all_blocks_json_bytes(),
+        media_type="application/json",
     )
 
 
@@ -41,3 +42,12 @@ async def get_block_code(block_id: int):
 
     lang = _data_service.get_block_language(block_id)
     return BlockCodeResponse(block_id=block_id, code=code, language=lang)
+
+
+@router.post("/blocks/code", response_model=BlockCodeBatchResponse)
+async def get_block_codes(request: BlockCodeBatchRequest):
+    """Fetch code for many blocks in one round trip; unknown IDs are omitted."""
+    if _data_service is None or not _data_service.is_ready():
+        raise HTTPException(status_code=503, detail="Service not ready")
+
+    return ORJSONResponse({"codes": _data_service.get_block_codes(request.block_ids)})
@@ -1,6 +1,7 @@
 """SVM classification endpoint."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from ..models.classification import SimilarityHistogramRequest, SimilarityHistogramResponse
 
 router = APIRouter()
@@ -17,4 +18,6 @@ def set_classification_service(svc):
 async def similarity_score_histogram(request: SimilarityHistogramRequest):
     if _classification_service is None:
         raise HTTPException(status_code=503, detail="Service not ready")
-    return await _classification_service.get_similarity_score_histogram(request)
+    # Service returns a plain dict; response_model documents the shape
+    result = await _classification_service.get_similarity_score_histogram(request)
+    return ORJSONResponse(result)
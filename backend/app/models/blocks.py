@@ -1,7 +1,7 @@
 """Block data models."""
 
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List
 
 
 class BlockInfo(BaseModel):
@@ -21,6 +21,23 @@ class BlockCodeResponse(BaseModel):
     language: str
 
 
+# Upper bound on IDs per batch code request (keeps one request from pulling every block)
+MAX_BLOCK_CODE_BATCH = 500
+
+
+class BlockCodeBatchRequest(BaseModel):
+    block_ids: List[int] = Field(max_length=MAX_BLOCK_CODE_BATCH)
+
+
+class BlockCodeEntry(BaseModel):
+    code: str
+    language: str
+
+
+class BlockCodeBatchResponse(BaseModel):
+    codes: Dict[str, BlockCodeEntry]
+
+
 class BlockListResponse(BaseModel):
     blocks: List[BlockInfo]
     metric_columns: List[str]
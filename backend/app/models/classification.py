@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Literal
+from typing_extensions import TypedDict
 from .common import HistogramData, HistogramStatistics
 
 
@@ -10,7 +11,7 @@ class WeightedBlockId(BaseModel):
     source: Literal["click", "threshold"]
 
 
-class CommitteeVoteInfo(BaseModel):
+class CommitteeVoteInfo(TypedDict):
     svm_prediction: int
     rf_prediction: int
     mlp_prediction: int
@@ -1,12 +1,12 @@
 """Cold start models."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
 
 class ColdStartRequest(BaseModel):
     block_ids: List[int]
-    num_suggestions: int = 10
+    num_suggestions: int = Field(default=10, ge=1)
 
 
 class ColdStartResponse(BaseModel):
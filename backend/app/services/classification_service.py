@@ -4,25 +4,28 @@ Binary SVM classification service for code authorship.
 Simplified from interface version — binary only, no OvR, no multi-class.
 """
 
+import asyncio
 import numpy as np
 import logging
 import hashlib
-from typing import List, Dict, Tuple, Optional
-from sklearn.svm import SVC
-from sklearn.preprocessing import StandardScaler
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Tuple, Optional
 
-from ..models.common import HistogramData
 from ..models.classification import (
     SimilarityHistogramRequest,
-    SimilarityHistogramResponse,
     WeightedBlockId,
-    CommitteeVoteInfo,
 )
-from ..models.common import HistogramStatistics
 from .committee_service import CommitteeService
-from .constants import CLICK_WEIGHT, THRESHOLD_WEIGHT
+from .constants import CLICK_WEIGHT, THRESHOLD_WEIGHT, WORKER_THREADS
 from .data_service import DataService
-from .svm_utils import train_svm_model, score_with_svm, build_similarity_histogram_response
+from .svm_utils import (
+    train_svm_model,
+    score_with_svm,
+    scale_features,
+    build_similarity_histogram_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,127 +33,199 @@ logger = logging.getLogger(__name__)
 class ClassificationService:
     """Binary SVM scoring for code blocks."""
 
+    # Identical requests landing within this window share one computation
+    COALESCE_WINDOW_S = 0.01
+
     def __init__(self, data_service: DataService):
         self.data_service = data_service
         self.committee_service = CommitteeService()
-        self._svm_cache: Dict[str, Tuple[SVC, StandardScaler]] = {}
+        # cache_key -> (svm, (mean, 1/std), (rf, mlp, scaler)); svm is an SVC or
+        # a Nystroem pipeline. One entry per training run keeps the committee
+        # paired with the scaling its inputs are standardized with.
+        self._model_cache: OrderedDict = OrderedDict()
         self._max_cache_size = 100
-
-    def _extract_metrics(self, block_ids: List[int]) -> Optional[np.ndarray]:
-        """Extract metric vectors for given block IDs. Returns (ids, matrix) or None."""
-        metrics_df = self.data_service.get_metrics(block_ids)
-        if metrics_df is None or len(metrics_df) == 0:
+        self._cache_lock = threading.Lock()
+        # sklearn/NumPy release the GIL, so requests genuinely overlap here
+        self._pool = ThreadPoolExecutor(max_workers=WORKER_THREADS)
+        self._inflight: Dict[bytes, "asyncio.Future[Dict[str, Any]]"] = {}
+        # Per-thread reusable training buffers (requests run concurrently in _pool)
+        self._buffers = threading.local()
+
+    def _extract_metrics(self, block_ids: List[int]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Extract metric vectors for given block IDs. Returns (ids, matrix) or None.
+
+        Uses the globally pre-standardized matrix; the SVM scaling then only
+        applies the residual per-training-set affine adjustment.
+        """
+        result = self.data_service.get_std_matrix(block_ids)
+        if result is None or len(result[0]) == 0:
             return None
-
-        metric_cols = self.data_service.metric_columns
-        if not metric_cols:
-            return None
-
-        ids = metrics_df["block_id"].to_numpy()
-        matrix = np.column_stack([
-            metrics_df[col].fill_null(0.0).to_numpy() for col in metric_cols
-        ])
+        ids, matrix, _ = result
         return ids, matrix
 
     async def get_similarity_score_histogram(
         self, request: SimilarityHistogramRequest
-    ) -> SimilarityHistogramResponse:
-        """Train SVM + committee, return histogram + votes."""
+    ) -> Dict[str, Any]:
+        """Train SVM + committee, return histogram + votes (as a plain dict)."""
         if not self.data_service.is_ready():
             raise RuntimeError("DataService not ready")
 
+        key = self._request_key(request)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._coalesced_compute(request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one client disconnecting doesn't cancel the shared work
+        return await asyncio.shield(task)
+
+    async def _coalesced_compute(self, request: SimilarityHistogramRequest) -> Dict[str, Any]:
+        """Debounce briefly so clustered duplicates join, then compute off-loop."""
+        await asyncio.sleep(self.COALESCE_WINDOW_S)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._compute, request)
+
+    def _compute(self, request: SimilarityHistogramRequest) -> Dict[str, Any]:
+        """CPU-bound part of get_similarity_score_histogram, run off the event loop."""
         result = self._extract_metrics(request.block_ids)
         if result is None:
-            return SimilarityHistogramResponse(
-                scores={},
-                histogram=HistogramData(bins=[], counts=[], bin_edges=[]),
-                statistics=HistogramStatistics(min=0.0, max=0.0, mean=0.0, median=0.0),
-                total_items=0,
-            )
+            return build_similarity_histogram_response({}, np.empty(0), 0)
 
         block_ids_arr, metrics_matrix = result
 
-        # Build ID-to-weight mapping
-        id_to_weight: Dict[int, float] = {}
-        selected_ids = set()
-        rejected_ids = set()
-        for item in request.selected_items:
-            selected_ids.add(item.id)
-            id_to_weight[item.id] = CLICK_WEIGHT if item.source == "click" else THRESHOLD_WEIGHT
-        for item in request.rejected_items:
-            rejected_ids.add(item.id)
-            id_to_weight[item.id] = CLICK_WEIGHT if item.source == "click" else THRESHOLD_WEIGHT
-
         # Partition indices
-        sel_indices, rej_indices = [], []
-        for i, bid in enumerate(block_ids_arr):
-            bid_int = int(bid)
-            if bid_int in selected_ids:
-                sel_indices.append(i)
-            elif bid_int in rejected_ids:
-                rej_indices.append(i)
-
-        if not sel_indices or not rej_indices:
+        sel_ids, sel_id_weights = self._sorted_ids_and_weights(request.selected_items)
+        rej_ids, rej_id_weights = self._sorted_ids_and_weights(request.rejected_items)
+        block_ids_arr = block_ids_arr.astype(np.int64, copy=False)
+        sel_mask = np.isin(block_ids_arr, sel_ids)
+        rej_mask = np.isin(block_ids_arr, rej_ids) & ~sel_mask
+        sel_indices = np.nonzero(sel_mask)[0]
+        rej_indices = np.nonzero(rej_mask)[0]
+
+        if len(sel_indices) == 0 or len(rej_indices) == 0:
             logger.warning("Need both selected and rejected items for SVM")
-            return SimilarityHistogramResponse(
-                scores={},
-                histogram=HistogramData(bins=[], counts=[], bin_edges=[]),
-                statistics=HistogramStatistics(min=0.0, max=0.0, mean=0.0, median=0.0),
-                total_items=0,
-            )
+            return build_similarity_histogram_response({}, np.empty(0), 0)
 
         sel_vectors = metrics_matrix[sel_indices]
         rej_vectors = metrics_matrix[rej_indices]
-        sel_weights = np.array([id_to_weight.get(int(block_ids_arr[i]), CLICK_WEIGHT) for i in sel_indices])
-        rej_weights = np.array([id_to_weight.get(int(block_ids_arr[i]), CLICK_WEIGHT) for i in rej_indices])
+        sel_weights = sel_id_weights[np.searchsorted(sel_ids, block_ids_arr[sel_indices])]
+        rej_weights = rej_id_weights[np.searchsorted(rej_ids, block_ids_arr[rej_indices])]
 
         # Check cache
         cache_key = self._cache_key(request.selected_items, request.rejected_items)
-        if cache_key in self._svm_cache:
-            model, scaler = self._svm_cache[cache_key]
-        else:
-            model, scaler = train_svm_model(sel_vectors, rej_vectors, sel_weights, rej_weights)
-            if len(self._svm_cache) >= self._max_cache_size:
-                self._svm_cache.pop(next(iter(self._svm_cache)))
-            self._svm_cache[cache_key] = (model, scaler)
+        entry = self._cache_get(self._model_cache, cache_key)
+        if entry is None:
+            model, scaling = train_svm_model(sel_vectors, rej_vectors, sel_weights, rej_weights)
+            committee = self._train_committee(sel_vectors, rej_vectors, sel_weights, rej_weights)
+            entry = (model, scaling, committee)
+            self._cache_put(self._model_cache, cache_key, entry)
+        model, (mu, inv_std), (rf, mlp, _) = entry
+
+        # Standardize once into this thread's buffer; shared by SVM scoring
+        # and committee prediction
+        X_scaled = scale_features(
+            metrics_matrix, mu, inv_std,
+            out=self._scaled_buffer(metrics_matrix.shape, metrics_matrix.dtype),
+        )
 
         # Score all blocks
-        scores = score_with_svm(model, scaler, metrics_matrix)
-        scores_dict = {str(int(bid)): float(s) for bid, s in zip(block_ids_arr, scores)}
-
-        # Train committee
-        X_train = np.vstack([sel_vectors, rej_vectors])
-        y_train = np.array([1] * len(sel_vectors) + [0] * len(rej_vectors))
-        sample_weights = np.concatenate([sel_weights, rej_weights])
-
-        rf, mlp, committee_scaler = self.committee_service.train_committee(
-            X_train, y_train, sample_weights
-        )
+        scores = score_with_svm(model, X_scaled)
+        item_ids = [str(bid) for bid in block_ids_arr.tolist()]
+        scores_dict = dict(zip(item_ids, scores.tolist()))
 
         committee_votes_response = None
         if rf is not None or mlp is not None:
-            X_scaled = scaler.transform(metrics_matrix)
-            preds = self.committee_service.predict_with_committee(
-                X_scaled, scores, rf, mlp, committee_scaler
-            )
-            item_ids = [str(int(bid)) for bid in block_ids_arr]
-            votes_dict = self.committee_service.get_vote_info_dict(item_ids, preds)
-            committee_votes_response = {
-                bid: CommitteeVoteInfo(
-                    svm_prediction=info["svm_prediction"],
-                    rf_prediction=info["rf_prediction"],
-                    mlp_prediction=info["mlp_prediction"],
-                    vote_entropy=info["vote_entropy"],
-                )
-                for bid, info in votes_dict.items()
-            }
+            # The committee scaler was fit on the same rows, in the same
+            # training run, as the SVM scaling, so X_scaled is already in the
+            # committee's feature space
+            preds = self.committee_service.predict_with_committee(X_scaled, scores, rf, mlp)
+            # Values come from our own arrays — no per-row model validation
+            committee_votes_response = self.committee_service.get_vote_info_dict(item_ids, preds)
 
         return build_similarity_histogram_response(
-            scores_dict, np.array(list(scores_dict.values())),
-            len(scores_dict), committee_votes_response,
+            scores_dict, scores, len(scores_dict), committee_votes_response,
         )
 
-    def _cache_key(self, selected: List[WeightedBlockId], rejected: List[WeightedBlockId]) -> str:
-        sel = sorted([(i.id, i.source) for i in selected])
-        rej = sorted([(i.id, i.source) for i in rejected])
-        return hashlib.md5(f"{sel}_{rej}".encode()).hexdigest()
+    def _train_committee(
+        self,
+        sel_vectors: np.ndarray,
+        rej_vectors: np.ndarray,
+        sel_weights: np.ndarray,
+        rej_weights: np.ndarray,
+    ) -> Tuple[Any, Any, Any]:
+        """Train RF + MLP on the SVM's training rows; returns (rf, mlp, scaler)."""
+        n_sel = len(sel_vectors)
+        X_train, y_train, sample_weights = self._training_buffers(
+            n_sel + len(rej_vectors), sel_vectors.shape[1], sel_vectors.dtype
+        )
+        X_train[:n_sel] = sel_vectors
+        X_train[n_sel:] = rej_vectors
+        y_train[:n_sel] = 1
+        y_train[n_sel:] = 0
+        sample_weights[:n_sel] = sel_weights
+        sample_weights[n_sel:] = rej_weights
+        return self.committee_service.train_committee(X_train, y_train, sample_weights)
+
+    def _training_buffers(
+        self, n: int, p: int, dtype: np.dtype
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (X, y, w) views of length n into this thread's reusable buffers."""
+        buf = self._buffers
+        X = getattr(buf, "X", None)
+        if X is None or X.shape[0] < n or X.shape[1] != p or X.dtype != dtype:
+            size = max(n, 4096)
+            buf.X = np.empty((size, p), dtype=dtype)
+            buf.y = np.empty(size, dtype=np.int64)
+            buf.w = np.empty(size, dtype=np.float64)
+        return buf.X[:n], buf.y[:n], buf.w[:n]
+
+    def _scaled_buffer(self, shape: Tuple[int, int], dtype: np.dtype) -> np.ndarray:
+        """Return a view of this thread's reusable buffer for the standardized matrix."""
+        buf = getattr(self._buffers, "scaled", None)
+        if buf is None or buf.shape[0] < shape[0] or buf.shape[1] != shape[1] or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers.scaled = buf
+        return buf[:shape[0]]
+
+    def _cache_get(self, cache: OrderedDict, key: bytes):
+        """LRU lookup; marks the entry as most recently used."""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is not None:
+                cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, cache: OrderedDict, key: bytes, entry) -> None:
+        """LRU insert; evicts the least recently used entry when full."""
+        with self._cache_lock:
+            cache[key] = entry
+            cache.move_to_end(key)
+            if len(cache) > self._max_cache_size:
+                cache.popitem(last=False)
+
+    @staticmethod
+    def _sorted_ids_and_weights(items: List[WeightedBlockId]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return item IDs sorted ascending with their source-derived weights."""
+        ids = np.fromiter((item.id for item in items), dtype=np.int64, count=len(items))
+        weights = np.fromiter(
+            (CLICK_WEIGHT if item.source == "click" else THRESHOLD_WEIGHT for item in items),
+            dtype=np.float64, count=len(items),
+        )
+        order = np.argsort(ids, kind="stable")
+        return ids[order], weights[order]
+
+    def _request_key(self, request: SimilarityHistogramRequest) -> bytes:
+        """Key identifying a full request: label sets plus the scored block IDs."""
+        h = hashlib.blake2b(self._cache_key(request.selected_items, request.rejected_items), digest_size=16)
+        h.update(np.sort(np.array(request.block_ids, dtype=np.int64)).tobytes())
+        return h.digest()
+
+    def _cache_key(self, selected: List[WeightedBlockId], rejected: List[WeightedBlockId]) -> bytes:
+        """Hash the (id, source) pairs of both label sets into a 16-byte key."""
+        h = hashlib.blake2b(digest_size=16)
+        for i, items in enumerate((selected, rejected)):
+            if i:
+                h.update(b"|")
+            pairs = sorted((item.id, 0 if item.source == "click" else 1) for item in items)
+            h.update(np.array(pairs, dtype=np.int64).tobytes())
+        return h.digest()
@@ -4,65 +4,167 @@ Cold-start service using Kennard-Stone algorithm.
 Simplified from interface version — blocks only, no pairs.
 """
 
+import asyncio
 import numpy as np
 import logging
-import random
-from typing import List, Optional
-from sklearn.preprocessing import StandardScaler
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
+from .constants import WORKER_THREADS
 from .data_service import DataService
 
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+# The parallel kernel is not re-entrant under numba's workqueue threading
+# layer (its fallback when neither TBB nor OpenMP is available), so calls
+# from the executor threads are serialized. Each call already spans the
+# worker's NUMBA_NUM_THREADS (its share of the cores, set by start.py).
+_ks_numba_lock = threading.Lock()
+
+# Rows per block of the seed-pair distance scan; bounds it to a
+# KS_SEED_CHUNK_ROWS x N buffer instead of the full N x N matrix
+KS_SEED_CHUNK_ROWS = 1024
+
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _ks_select_numba(X, sq, i0, j0, n):
+        """Kennard-Stone selection loop fused into parallel passes over N."""
+        n_samples, n_features = X.shape
+        selected = np.empty(n, dtype=np.int64)
+        selected[0] = i0
+        selected[1] = j0
+
+        min_d2 = np.empty(n_samples, dtype=np.float64)
+        for t in prange(n_samples):
+            di = 0.0
+            dj = 0.0
+            for f in range(n_features):
+                di += X[t, f] * X[i0, f]
+                dj += X[t, f] * X[j0, f]
+            min_d2[t] = min(sq[t] + sq[i0] - 2.0 * di, sq[t] + sq[j0] - 2.0 * dj)
+        min_d2[i0] = -1.0
+        min_d2[j0] = -1.0
+
+        for s in range(2, n):
+            k = np.argmax(min_d2)
+            selected[s] = k
+            for t in prange(n_samples):
+                if min_d2[t] < 0.0:
+                    continue
+                d = 0.0
+                for f in range(n_features):
+                    d += X[t, f] * X[k, f]
+                d = sq[t] + sq[k] - 2.0 * d
+                if d < min_d2[t]:
+                    min_d2[t] = d
+            min_d2[k] = -1.0
+
+        return selected
+
+else:
+    _ks_select_numba = None
+
 
 class ColdStartService:
     """Diversity-based representative sampling for bootstrap."""
 
     def __init__(self, data_service: DataService):
         self.data_service = data_service
+        self._pool = ThreadPoolExecutor(max_workers=WORKER_THREADS)
 
     async def get_suggestions(
         self, block_ids: List[int], num_suggestions: int = 10
     ) -> List[int]:
         """Select diverse block IDs using Kennard-Stone."""
-        metrics_df = self.data_service.get_metrics(block_ids)
-        metric_cols = self.data_service.metric_columns
-
-        if metrics_df is None or len(metrics_df) == 0 or not metric_cols:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, self._compute_suggestions, block_ids, num_suggestions
+        )
+
+    def _compute_suggestions(self, block_ids: List[int], num_suggestions: int) -> List[int]:
+        """CPU-bound part of get_suggestions, run off the event loop."""
+        result = self.data_service.get_std_matrix(block_ids)
+        if result is None or len(result[0]) == 0:
             return self._random_fallback(block_ids, num_suggestions)
 
-        id_list = metrics_df["block_id"].to_list()
-        matrix = np.column_stack([
-            metrics_df[col].fill_null(0.0).to_numpy() for col in metric_cols
-        ])
-
-        scaler = StandardScaler()
-        scaled = scaler.fit_transform(matrix)
+        ids, scaled, sq = result
+        id_list = ids.tolist()
 
         n_select = min(num_suggestions, len(id_list))
-        indices = self._kennard_stone(scaled, n_select)
+        indices = self._kennard_stone(scaled, n_select, sq)
 
         selected = [id_list[i] for i in indices]
         logger.info(f"Kennard-Stone selected {len(selected)} diverse blocks")
         return selected
 
-    def _kennard_stone(self, X: np.ndarray, n: int) -> List[int]:
-        """Kennard-Stone: iteratively select max-min-distance points."""
+    def _kennard_stone(
+        self, X: np.ndarray, n: int, sq: Optional[np.ndarray] = None
+    ) -> List[int]:
+        """Kennard-Stone: iteratively select max-min-distance points.
+
+        Uses squared distances via ||a||^2 + ||b||^2 - 2ab. The seed pair is
+        found by scanning the distance matrix in row blocks (memory stays
+        O(N) per block); afterwards a single min-distance vector is updated
+        against each newly selected row. The update loop runs under numba
+        when it is installed (compiled on first use and cached on disk).
+        ``sq`` may carry precomputed squared row norms of X.
+        """
         n_samples = X.shape[0]
         if n >= n_samples:
             return list(range(n_samples))
-
-        dist = np.linalg.norm(X[:, np.newaxis] - X, axis=2)
-        i, j = np.unravel_index(np.argmax(dist), dist.shape)
-        selected = [int(i), int(j)]
-
+        if n <= 0:
+            return []
+
+        if sq is None:
+            sq = np.einsum("ij,ij->i", X, X)
+        i, j = self._farthest_pair(X, sq)
+        selected = [int(i), int(j)][:n]
+        if n <= 2:
+            return selected
+
+        if _ks_select_numba is not None:
+            X = np.ascontiguousarray(X, dtype=np.float64)
+            sq = sq.astype(np.float64, copy=False)
+            with _ks_numba_lock:
+                return _ks_select_numba(X, sq, selected[0], selected[1], n).tolist()
+
+        min_d2 = np.minimum(
+            sq + sq[i] - 2.0 * (X @ X[i]),
+            sq + sq[j] - 2.0 * (X @ X[j]),
+        )
         while len(selected) < n:
-            min_dists = dist[selected].min(axis=0)
-            min_dists[selected] = -1
-            selected.append(int(np.argmax(min_dists)))
+            min_d2[selected] = -1
+            k = int(np.argmax(min_d2))
+            selected.append(k)
+            np.minimum(min_d2, sq + sq[k] - 2.0 * (X @ X[k]), out=min_d2)
 
         return selected
 
+    def _farthest_pair(self, X: np.ndarray, sq: np.ndarray) -> Tuple[int, int]:
+        """Indices of the most distant pair, one row block at a time."""
+        n_samples = X.shape[0]
+        best, i, j = -np.inf, 0, 0
+        for start in range(0, n_samples, KS_SEED_CHUNK_ROWS):
+            stop = start + KS_SEED_CHUNK_ROWS
+            d2 = X[start:stop] @ X.T
+            d2 *= -2.0
+            d2 += sq[start:stop, np.newaxis]
+            d2 += sq[np.newaxis, :]
+            r, c = divmod(int(np.argmax(d2)), n_samples)
+            if d2[r, c] > best:
+                best, i, j = d2[r, c], start + r, c
+        return i, j
+
     def _random_fallback(self, block_ids: List[int], n: int) -> List[int]:
-        random.seed(42)
-        return random.sample(block_ids, min(n, len(block_ids)))
+        # Local generator: no global RNG state shared across executor threads
+        rng = np.random.default_rng(42)
+        picks = rng.choice(len(block_ids), size=min(n, len(block_ids)), replace=False)
+        return [block_ids[i] for i in picks.tolist()]
@@ -12,11 +12,24 @@ from dataclasses import dataclass
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from .constants import WORKER_THREADS
 from .pytorch_mlp import WeightedMLPClassifier
 
 logger = logging.getLogger(__name__)
 
 
+def _vote_entropy(n_positive: int, n_votes: int = 3) -> float:
+    """Entropy (bits) of a binary vote split."""
+    return float(sum(
+        -c / n_votes * np.log2(c / n_votes)
+        for c in (n_positive, n_votes - n_positive) if c > 0
+    ))
+
+
+# Vote entropy indexed by the number of positive votes (0..3)
+_ENTROPY_LUT = np.array([_vote_entropy(k) for k in range(4)])
+
+
 @dataclass
 class CommitteePrediction:
     """Prediction result from the committee (binary)."""
@@ -68,7 +81,7 @@ class CommitteeService:
             depth = min(5, max(2, int(np.log2(n + 1))))
             rf = RandomForestClassifier(
                 n_estimators=n_est, max_depth=depth,
-                class_weight="balanced", random_state=42, n_jobs=-1,
+                class_weight="balanced", random_state=42, n_jobs=WORKER_THREADS,
             )
             rf.fit(X, y, sample_weight=weights)
             return rf
@@ -91,43 +104,38 @@ class CommitteeService:
 
     def predict_with_committee(
         self,
-        X: np.ndarray,
+        X_scaled: np.ndarray,
         svm_scores: np.ndarray,
         rf_model: Optional[RandomForestClassifier],
         mlp_model: Optional[WeightedMLPClassifier],
-        scaler: Optional[StandardScaler],
     ) -> Dict[int, CommitteePrediction]:
-        """Get committee predictions and vote entropy."""
-        n_samples = len(svm_scores)
-        svm_preds = (svm_scores > 0).astype(int)
-        results: Dict[int, CommitteePrediction] = {}
+        """Get committee predictions and vote entropy.
+
+        ``X_scaled`` must already be standardized with the committee scaler.
+        """
+        svm_preds = (svm_scores > 0).astype(np.int8)
 
         if rf_model is None and mlp_model is None:
-            for i in range(n_samples):
-                results[i] = CommitteePrediction(
-                    svm_prediction=int(svm_preds[i]),
-                    rf_prediction=int(svm_preds[i]),
-                    mlp_prediction=int(svm_preds[i]),
-                    vote_entropy=0.0,
+            svm_list = svm_preds.tolist()
+            return {
+                i: CommitteePrediction(
+                    svm_prediction=v, rf_prediction=v, mlp_prediction=v, vote_entropy=0.0,
                 )
-            return results
-
-        X_scaled = scaler.transform(X) if scaler is not None else X
-        rf_preds = rf_model.predict(X_scaled).astype(int) if rf_model else svm_preds
-        mlp_preds = mlp_model.predict(X_scaled).astype(int) if mlp_model else svm_preds
-
-        for i in range(n_samples):
-            votes = [int(svm_preds[i]), int(rf_preds[i]), int(mlp_preds[i])]
-            counts = [votes.count(0), votes.count(1)]
-            entropy = sum(-p / 3 * np.log2(p / 3) for p in counts if p > 0)
-            results[i] = CommitteePrediction(
-                svm_prediction=votes[0],
-                rf_prediction=votes[1],
-                mlp_prediction=votes[2],
-                vote_entropy=float(entropy),
-            )
+                for i, v in enumerate(svm_list)
+            }
 
-        return results
+        rf_preds = rf_model.predict(X_scaled).astype(np.int8) if rf_model else svm_preds
+        mlp_preds = mlp_model.predict(X_scaled).astype(np.int8) if mlp_model else svm_preds
+
+        entropies = _ENTROPY_LUT[svm_preds + rf_preds + mlp_preds].tolist()
+        return {
+            i: CommitteePrediction(
+                svm_prediction=s, rf_prediction=r, mlp_prediction=m, vote_entropy=e,
+            )
+            for i, (s, r, m, e) in enumerate(zip(
+                svm_preds.tolist(), rf_preds.tolist(), mlp_preds.tolist(), entropies,
+            ))
+        }
 
     def get_vote_info_dict(
         self,
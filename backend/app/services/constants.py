@@ -1,4 +1,10 @@
-"""Shared constants for SVM training."""
+"""Shared constants for SVM training and service thread pools."""
+
+import os
 
 CLICK_WEIGHT = 1.0
 THRESHOLD_WEIGHT = 0.2
+
+# Threads per worker process for the service executors. start.py exports
+# WORKER_THREADS = cpu_count // workers so pools don't multiply per worker.
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "0")) or (os.cpu_count() or 1)
@@ -1,9 +1,11 @@
 """Data service — loads blocks.parquet and metrics.parquet."""
 
+import numpy as np
+import orjson
 import polars as pl
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +15,15 @@ class DataService:
 
     def __init__(self):
         self._blocks_df: Optional[pl.DataFrame] = None
-        self._metrics_lazy: Optional[pl.LazyFrame] = None
+        self._metric_ids: Optional[np.ndarray] = None
+        self._metric_row: Dict[int, int] = {}
+        self._metric_matrix_std: Optional[np.ndarray] = None
+        self._metric_sq: Optional[np.ndarray] = None
         self._metric_columns: List[str] = []
+        self._blocks_json_bytes: Optional[bytes] = None
+        self._id_to_row: Dict[int, int] = {}
+        self._codes: List[str] = []
+        self._languages: List[str] = []
         self._ready = False
 
     async def initialize(self):
@@ -29,50 +38,108 @@ class DataService:
 
         self._blocks_df = pl.read_parquet(blocks_path)
         logger.info(f"Loaded {len(self._blocks_df)} blocks")
+        # List views never need the code column — project it away once
+        blocks_meta_df = self._blocks_df.select(
+            [c for c in self._blocks_df.columns if c != "code"]
+        )
+
+        # Single-block lookups go through a hash index instead of a column scan
+        ids = self._blocks_df["block_id"].to_list()
+        self._id_to_row = dict(zip(ids, range(len(ids))))
+        self._codes = self._blocks_df["code"].to_list()
+        self._languages = self._blocks_df["language"].to_list()
 
         if metrics_path.exists():
-            self._metrics_lazy = pl.scan_parquet(metrics_path)
+            metrics_df = pl.read_parquet(metrics_path)
             # Discover metric columns (all except block_id)
-            schema = pl.read_parquet_schema(metrics_path)
-            self._metric_columns = [c for c in schema if c != "block_id"]
+            self._metric_columns = [c for c in metrics_df.columns if c != "block_id"]
+
+            # Metrics fit in memory — keep one contiguous float32 matrix plus a row index
+            self._metric_ids = metrics_df["block_id"].to_numpy()
+            matrix = np.ascontiguousarray(np.column_stack([
+                metrics_df[col].fill_null(0.0).to_numpy().astype(np.float32)
+                for col in self._metric_columns
+            ]))
+            self._metric_row = {int(b): i for i, b in enumerate(self._metric_ids)}
+
+            # Only the globally standardized matrix (StandardScaler semantics)
+            # is kept, standardized in place, along with its squared row
+            # norms; both are shared by SVM scoring and Kennard-Stone
+            mean = matrix.mean(axis=0, dtype=np.float64)
+            std = matrix.std(axis=0, dtype=np.float64)
+            std[std == 0.0] = 1.0
+            matrix -= mean.astype(np.float32)
+            matrix /= std.astype(np.float32)
+            self._metric_matrix_std = matrix
+            self._metric_sq = np.einsum(
+                "ij,ij->i", self._metric_matrix_std, self._metric_matrix_std
+            )
             logger.info(f"Loaded metrics with columns: {self._metric_columns}")
         else:
             logger.warning("metrics.parquet not found — metric features unavailable")
 
+        # Block metadata is immutable after load — serialize the list payload once
+        self._blocks_json_bytes = orjson.dumps({
+            "blocks": blocks_meta_df.to_dicts(),
+            "metric_columns": self._metric_columns,
+            "total_blocks": len(self._blocks_df),
+        })
+
         self._ready = True
 
     def is_ready(self) -> bool:
         return self._ready
 
-    def get_all_blocks(self) -> pl.DataFrame:
-        """Return block metadata (without code column for list performance)."""
-        assert self._blocks_df is not None
-        cols = [c for c in self._blocks_df.columns if c != "code"]
-        return self._blocks_df.select(cols)
+    def get_all_blocks_json_bytes(self) -> bytes:
+        """Return the pre-serialized /blocks response payload."""
+        assert self._blocks_json_bytes is not None
+        return self._blocks_json_bytes
 
     def get_block_code(self, block_id: int) -> Optional[str]:
         """Return code text for a single block."""
-        assert self._blocks_df is not None
-        row = self._blocks_df.filter(pl.col("block_id") == block_id)
-        if len(row) == 0:
+        idx = self._id_to_row.get(block_id)
+        if idx is None:
             return None
-        return row["code"][0]
+        return self._codes[idx]
 
     def get_block_language(self, block_id: int) -> str:
         """Return language for a single block."""
-        assert self._blocks_df is not None
-        row = self._blocks_df.filter(pl.col("block_id") == block_id)
-        if len(row) == 0:
+        idx = self._id_to_row.get(block_id)
+        if idx is None:
             return "text"
-        return row["language"][0]
-
-    def get_metrics(self, block_ids: List[int]) -> Optional[pl.DataFrame]:
-        """Return metrics DataFrame for given block IDs."""
-        if self._metrics_lazy is None:
+        return self._languages[idx]
+
+    def get_block_codes(self, block_ids: List[int]) -> Dict[str, Dict[str, str]]:
+        """Return {block_id: {code, language}} for all known IDs in one pass."""
+        id_to_row = self._id_to_row
+        codes, languages = self._codes, self._languages
+        result = {}
+        for block_id in block_ids:
+            idx = id_to_row.get(block_id)
+            if idx is not None:
+                result[str(block_id)] = {"code": codes[idx], "language": languages[idx]}
+        return result
+
+    def _metric_rows(self, block_ids: List[int]) -> np.ndarray:
+        """Row positions in the metrics matrix for the known block IDs.
+
+        Duplicate IDs are dropped (first occurrence wins), so each block
+        contributes one row.
+        """
+        row_index = self._metric_row
+        return np.fromiter(
+            (row_index[b] for b in dict.fromkeys(block_ids) if b in row_index),
+            dtype=np.int64,
+        )
+
+    def get_std_matrix(
+        self, block_ids: List[int]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Return (ids, standardized matrix, squared row norms) for the given block IDs."""
+        if self._metric_matrix_std is None or not self._metric_columns:
             return None
-        return self._metrics_lazy.filter(
-            pl.col("block_id").is_in(block_ids)
-        ).collect()
+        rows = self._metric_rows(block_ids)
+        return self._metric_ids[rows], self._metric_matrix_std[rows], self._metric_sq[rows]
 
     @property
     def metric_columns(self) -> List[str]:
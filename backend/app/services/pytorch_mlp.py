@@ -10,17 +10,55 @@ Reference:
     back-propagation."
 """
 
+import contextlib
+import functools
+import math
 import numpy as np
 import logging
 from typing import Optional, Tuple
 
 import torch
 import torch.nn as nn
-from torch.utils.data import TensorDataset, DataLoader
 
 logger = logging.getLogger(__name__)
 
 
+def _default_device() -> torch.device:
+    """Pick CUDA, then Apple MPS, then CPU."""
+    if torch.cuda.is_available():
+        return torch.device("cuda")
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return torch.device("mps")
+    return torch.device("cpu")
+
+
+def _two_hidden_forward(
+    x: torch.Tensor,
+    w1_t: torch.Tensor, b1: torch.Tensor,
+    w2_t: torch.Tensor, b2: torch.Tensor,
+    w3_t: torch.Tensor, b3: torch.Tensor,
+) -> torch.Tensor:
+    """Inference forward for the default two-hidden-layer shape, e.g. (32, 16)."""
+    h = torch.relu(torch.addmm(b1, x, w1_t))
+    h = torch.relu(torch.addmm(b2, h, w2_t))
+    return torch.addmm(b3, h, w3_t)
+
+
+@functools.lru_cache(maxsize=None)
+def _two_hidden_forward_fn():
+    """TorchScript-compiled ``_two_hidden_forward``, scripted on first use.
+
+    Falls back to the eager addmm function if scripting is unavailable on
+    this platform, so importing this module never depends on TorchScript.
+    """
+    try:
+        return torch.jit.script(_two_hidden_forward)
+    except Exception as e:
+        logger.debug(f"TorchScript unavailable for fast path, using eager addmm: {e}")
+        return _two_hidden_forward
+
+
 class _MLPNetwork(nn.Module):
     """Simple feedforward network for classification."""
 
@@ -70,6 +108,12 @@ class WeightedMLPClassifier:
         Mini-batch size for training.
     random_state : int, optional
         Random seed for reproducibility.
+    use_amp : bool, default=True
+        Use float16 autocast with gradient scaling when training on CUDA.
+        Ignored on other devices.
+    compile_step : bool, default=False
+        Compile the optimization step with ``torch.compile``. Compilation
+        takes seconds, so this only pays off for long fits on large data.
     """
 
     def __init__(
@@ -82,7 +126,9 @@ class WeightedMLPClassifier:
         n_iter_no_change: int = 20,
         learning_rate_init: float = 0.001,
         batch_size: int = 32,
-        random_state: Optional[int] = None
+        random_state: Optional[int] = None,
+        use_amp: bool = True,
+        compile_step: bool = False
     ):
         self.hidden_layer_sizes = hidden_layer_sizes
         self.alpha = alpha
@@ -93,9 +139,15 @@ class WeightedMLPClassifier:
         self.learning_rate_init = learning_rate_init
         self.batch_size = batch_size
         self.random_state = random_state
+        self.use_amp = use_amp
+        self.compile_step = compile_step
 
         self._model: Optional[_MLPNetwork] = None
         self._classes: Optional[np.ndarray] = None
+        self._scripted: Optional[torch.jit.ScriptModule] = None
+        self._fast_params: Optional[Tuple[torch.Tensor, ...]] = None
+        self._rng: np.random.Generator = np.random.default_rng(random_state)
+        self.device: torch.device = torch.device("cpu")
         self.n_iter_: int = 0
 
     def fit(
@@ -121,21 +173,26 @@ class WeightedMLPClassifier:
         self : WeightedMLPClassifier
             Fitted estimator.
         """
+        # Local generators for the validation split, weight init and batch
+        # order: fits run concurrently on executor threads, so neither the
+        # global NumPy nor the global torch RNG may be seeded or shared
+        self._rng = np.random.default_rng(self.random_state)
+        torch_gen = torch.Generator()
         if self.random_state is not None:
-            torch.manual_seed(self.random_state)
-            np.random.seed(self.random_state)
+            torch_gen.manual_seed(self.random_state)
+        else:
+            torch_gen.seed()
 
-        # Convert to numpy arrays
-        X = np.asarray(X, dtype=np.float32)
+        # Convert to numpy arrays (no copy when X is already contiguous float32)
+        X = np.ascontiguousarray(X, dtype=np.float32)
         y = np.asarray(y)
 
         # Store unique classes for prediction
         self._classes = np.unique(y)
         n_classes = len(self._classes)
 
-        # Map labels to 0, 1, ..., n_classes-1
-        label_map = {label: idx for idx, label in enumerate(self._classes)}
-        y_mapped = np.array([label_map[label] for label in y])
+        # Map labels to 0, 1, ..., n_classes-1 (np.unique output is sorted)
+        y_mapped = np.searchsorted(self._classes, y).astype(np.int64)
 
         # Default sample weights
         if sample_weight is None:
@@ -143,37 +200,30 @@ class WeightedMLPClassifier:
         else:
             sample_weight = np.asarray(sample_weight, dtype=np.float32)
 
+        # Move the full dataset to the device once, then split by index there
+        self.device = _default_device()
+        X_t = self._to_device(X, pin=True)
+        y_t = self._to_device(y_mapped, pin=True)
+        w_t = self._to_device(sample_weight, pin=True)
+
         # Train/validation split for early stopping
         if self.early_stopping:
-            X_train, X_val, y_train, y_val, w_train, w_val = self._train_val_split(
-                X, y_mapped, sample_weight
+            train_idx, val_idx = (
+                torch.from_numpy(idx).to(self.device)
+                for idx in self._train_val_split(len(y_mapped))
             )
+            X_train_t, y_train_t, w_train_t = X_t[train_idx], y_t[train_idx], w_t[train_idx]
+            X_val_t, y_val_t, w_val_t = X_t[val_idx], y_t[val_idx], w_t[val_idx]
         else:
-            X_train, y_train, w_train = X, y_mapped, sample_weight
-            X_val, y_val, w_val = None, None, None
-
-        # Convert to tensors
-        X_train_t = torch.from_numpy(X_train)
-        y_train_t = torch.from_numpy(y_train).long()
-        w_train_t = torch.from_numpy(w_train)
-
-        if X_val is not None:
-            X_val_t = torch.from_numpy(X_val)
-            y_val_t = torch.from_numpy(y_val).long()
-            w_val_t = torch.from_numpy(w_val)
-        else:
+            X_train_t, y_train_t, w_train_t = X_t, y_t, w_t
             X_val_t, y_val_t, w_val_t = None, None, None
 
         # Initialize model
-        input_dim = X_train.shape[1]
-        self._model = _MLPNetwork(input_dim, self.hidden_layer_sizes, n_classes)
+        input_dim = X.shape[1]
+        self._model = self._init_network(input_dim, n_classes, torch_gen).to(self.device)
 
         # Optimizer with weight_decay for L2 regularization (matches sklearn's alpha)
-        optimizer = torch.optim.Adam(
-            self._model.parameters(),
-            lr=self.learning_rate_init,
-            weight_decay=self.alpha
-        )
+        optimizer = self._make_optimizer()
 
         # Learning rate scheduler (matches sklearn's learning_rate='adaptive')
         scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(
@@ -183,36 +233,80 @@ class WeightedMLPClassifier:
         # Loss function with per-sample losses
         criterion = nn.CrossEntropyLoss(reduction='none')
 
-        # Create data loader
-        train_dataset = TensorDataset(X_train_t, y_train_t, w_train_t)
-        train_loader = DataLoader(
-            train_dataset,
-            batch_size=min(self.batch_size, len(X_train)),
-            shuffle=True
-        )
-
-        # Training loop
-        best_val_loss = float('inf')
-        epochs_no_improve = 0
-        epoch = 0
+        # Mixed precision (CUDA only): fp16 forward/loss, scaled backward
+        amp_enabled = self.use_amp and self.device.type == "cuda"
+        if hasattr(torch, "amp") and hasattr(torch.amp, "GradScaler"):
+            grad_scaler = torch.amp.GradScaler("cuda", enabled=amp_enabled)
+        else:
+            # torch < 2.3
+            grad_scaler = torch.cuda.amp.GradScaler(enabled=amp_enabled)
 
-        for epoch in range(self.max_iter):
-            self._model.train()
-            epoch_loss = 0.0
+        model = self._model
 
-            for batch_X, batch_y, batch_w in train_loader:
-                optimizer.zero_grad()
+        def step(batch_X: torch.Tensor, batch_y: torch.Tensor, batch_w: torch.Tensor) -> torch.Tensor:
+            # set_to_none skips zero-filling every gradient tensor
+            optimizer.zero_grad(set_to_none=True)
 
-                outputs = self._model(batch_X)
+            # autocast is only entered when enabled: torch < 2.5 rejects
+            # device_type='mps' even with enabled=False
+            autocast = (
+                torch.autocast(device_type="cuda", dtype=torch.float16)
+                if amp_enabled else contextlib.nullcontext()
+            )
+            with autocast:
+                outputs = model(batch_X)
                 loss_per_sample = criterion(outputs, batch_y)
 
                 # Apply sample weights to loss (cVIL approach)
                 weighted_loss = (loss_per_sample * batch_w).mean()
 
-                weighted_loss.backward()
-                optimizer.step()
+            grad_scaler.scale(weighted_loss).backward()
+            grad_scaler.step(optimizer)
+            grad_scaler.update()
+            return weighted_loss.detach()
+
+        train_step = step
+        if self.compile_step and hasattr(torch, "compile"):
+            train_step = torch.compile(step, mode="reduce-overhead")
 
-                epoch_loss += weighted_loss.item()
+        # Mini-batches are gathered on-device from a per-epoch permutation,
+        # avoiding DataLoader collation and host-device traffic
+        n_train = len(X_train_t)
+        batch_size = min(self.batch_size, n_train)
+
+        # Training loop
+        best_val_loss = float('inf')
+        epochs_no_improve = 0
+        epoch = 0
+
+        # Epoch loss stays on-device and is only synced when debug logging is on
+        log_epoch_loss = logger.isEnabledFor(logging.DEBUG)
+
+        for epoch in range(self.max_iter):
+            self._model.train()
+            epoch_loss = torch.zeros((), device=self.device)
+
+            # Drawn from the per-fit CPU generator; n_train indices per epoch
+            perm = torch.randperm(n_train, generator=torch_gen).to(self.device)
+            for start in range(0, n_train, batch_size):
+                idx = perm[start:start + batch_size]
+                batch_X = X_train_t[idx]
+                batch_y = y_train_t[idx]
+                batch_w = w_train_t[idx]
+
+                try:
+                    weighted_loss = train_step(batch_X, batch_y, batch_w)
+                except Exception as e:
+                    if train_step is step:
+                        raise
+                    logger.debug(f"Compiled train step failed, using eager step: {e}")
+                    train_step = step
+                    weighted_loss = train_step(batch_X, batch_y, batch_w)
+
+                epoch_loss += weighted_loss
+
+            if log_epoch_loss:
+                logger.debug(f"MLP epoch {epoch + 1}: train loss {epoch_loss.item():.4f}")
 
             # Early stopping check
             if self.early_stopping and X_val_t is not None and y_val_t is not None and w_val_t is not None:
@@ -231,52 +325,133 @@ class WeightedMLPClassifier:
                         break
 
         self.n_iter_ = epoch + 1
+        self._fast_params = self._two_hidden_params()
+        self._scripted = self._script_for_inference() if self._fast_params is None else None
         return self
 
-    def _train_val_split(
-        self,
-        X: np.ndarray,
-        y: np.ndarray,
-        sample_weight: np.ndarray
-    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-        """Split data into training and validation sets."""
-        n_samples = len(y)
+    def _init_network(
+        self, input_dim: int, n_classes: int, generator: torch.Generator
+    ) -> _MLPNetwork:
+        """Build the network with nn.Linear's default init drawn from ``generator``.
+
+        kaiming_uniform_(a=sqrt(5)) and the bias init both reduce to
+        U(-1/sqrt(fan_in), 1/sqrt(fan_in)); redrawing them here keeps the
+        weights independent of the global torch RNG.
+        """
+        model = _MLPNetwork(input_dim, self.hidden_layer_sizes, n_classes)
+        with torch.no_grad():
+            for layer in model.network:
+                if isinstance(layer, nn.Linear):
+                    bound = 1.0 / math.sqrt(layer.in_features)
+                    layer.weight.uniform_(-bound, bound, generator=generator)
+                    layer.bias.uniform_(-bound, bound, generator=generator)
+        return model
+
+    def _two_hidden_params(self) -> Optional[Tuple[torch.Tensor, ...]]:
+        """Plain (pre-transposed) weight tensors for ``_two_hidden_forward``.
+
+        Only for two hidden layers (the default (32, 16)); other shapes use the
+        scripted module.
+        """
+        model = self._model
+        assert model is not None
+        if len(self.hidden_layer_sizes) != 2:
+            return None
+        linears = [m for m in model.network if isinstance(m, nn.Linear)]
+        params = []
+        for layer in linears:
+            params.append(layer.weight.detach().t().contiguous())
+            params.append(layer.bias.detach())
+        return tuple(params)
+
+    def _make_optimizer(self) -> torch.optim.Adam:
+        """Adam with a fused (CUDA) or multi-tensor update kernel where available."""
+        model = self._model
+        assert model is not None
+        kwargs = dict(lr=self.learning_rate_init, weight_decay=self.alpha)
+        try:
+            if self.device.type == "cuda":
+                return torch.optim.Adam(model.parameters(), fused=True, **kwargs)
+            return torch.optim.Adam(model.parameters(), foreach=True, **kwargs)
+        except (TypeError, RuntimeError):
+            # Older torch without fused/foreach support for this device
+            return torch.optim.Adam(model.parameters(), **kwargs)
+
+    def _to_device(self, arr: np.ndarray, pin: bool = False) -> torch.Tensor:
+        """Copy a host array to the model device.
+
+        With ``pin`` (used for the fit tensors) the source is pinned first on
+        CUDA so the copy is an async DMA that overlaps with whatever the
+        device is already running. One-shot predict inputs skip pinning: the
+        page-locked allocation plus extra memcpy costs more than it saves.
+        """
+        t = torch.from_numpy(arr)
+        if pin and self.device.type == "cuda":
+            return t.pin_memory().to(self.device, non_blocking=True)
+        return t.to(self.device)
+
+    def _script_for_inference(self) -> Optional[torch.jit.ScriptModule]:
+        """Freeze and optimize a TorchScript copy of the trained network.
+
+        Returns None (eager fallback) if scripting fails on this platform.
+        """
+        model = self._model
+        assert model is not None
+        model.eval()
+        try:
+            frozen = torch.jit.freeze(torch.jit.script(model))
+            return torch.jit.optimize_for_inference(frozen)
+        except Exception as e:
+            logger.debug(f"TorchScript optimization unavailable, using eager model: {e}")
+            return None
+
+    def _forward(self, X_t: torch.Tensor) -> torch.Tensor:
+        """Inference forward pass, preferring the specialized/scripted paths."""
+        if self._fast_params is not None:
+            return _two_hidden_forward_fn()(X_t, *self._fast_params)
+        if self._scripted is not None:
+            return self._scripted(X_t)
+        model = self._model
+        assert model is not None
+        model.eval()
+        return model(X_t)
+
+    def _train_val_split(self, n_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (train_idx, val_idx) index arrays for the validation split."""
         n_val = max(1, int(n_samples * self.validation_fraction))
 
         # Ensure at least one sample in training
         if n_samples - n_val < 1:
             n_val = n_samples - 1
 
-        indices = np.arange(n_samples)
-        if self.random_state is not None:
-            np.random.seed(self.random_state)
-        np.random.shuffle(indices)
+        indices = self._rng.permutation(n_samples)
 
-        val_idx = indices[:n_val]
-        train_idx = indices[n_val:]
-
-        return (
-            X[train_idx], X[val_idx],
-            y[train_idx], y[val_idx],
-            sample_weight[train_idx], sample_weight[val_idx]
-        )
+        return indices[n_val:], indices[:n_val]
 
     def _compute_weighted_loss(
         self,
         X: torch.Tensor,
         y: torch.Tensor,
         w: torch.Tensor,
-        criterion: nn.CrossEntropyLoss
+        criterion: nn.CrossEntropyLoss,
+        chunk_size: int = 4096
     ) -> float:
-        """Compute weighted loss on a dataset."""
+        """Compute weighted loss on a dataset.
+
+        Evaluated in row chunks so peak activation memory is bounded; the sum
+        of weighted losses is divided by the sample count at the end, which
+        equals the unchunked ``mean()``.
+        """
         model = self._model
         assert model is not None
         model.eval()
+        total = torch.zeros((), device=X.device)
         with torch.no_grad():
-            outputs = model(X)
-            loss_per_sample = criterion(outputs, y)
-            weighted_loss = (loss_per_sample * w).mean()
-        return weighted_loss.item()
+            for start in range(0, len(X), chunk_size):
+                stop = start + chunk_size
+                loss_per_sample = criterion(model(X[start:stop]), y[start:stop])
+                total += (loss_per_sample * w[start:stop]).sum()
+        return (total / len(X)).item()
 
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
@@ -291,23 +466,31 @@ class WeightedMLPClassifier:
         -------
         y_pred : array of shape (n_samples,)
             Predicted class labels.
+
+        Notes
+        -----
+        Takes the argmax of the raw logits; softmax is monotonic, so
+        ``predict`` never needs ``predict_proba``.
         """
         if self._model is None or self._classes is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
 
-        X = np.asarray(X, dtype=np.float32)
-        X_t = torch.from_numpy(X)
-
-        model = self._model
         classes = self._classes
 
-        model.eval()
+        # Degenerate fit on a single class: no forward pass needed
+        if len(classes) == 1:
+            return np.full(len(X), classes[0], dtype=classes.dtype)
+
+        # No-op when X is already contiguous float32 (e.g. a scaled buffer)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        X_t = self._to_device(X)
+
         with torch.no_grad():
-            outputs = model(X_t)
-            _, predicted = torch.max(outputs, 1)
+            outputs = self._forward(X_t)
+            predicted = outputs.argmax(dim=1)
 
         # Map back to original labels
-        return classes[predicted.numpy()]
+        return classes[predicted.cpu().numpy()]
 
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         """
@@ -326,13 +509,12 @@ class WeightedMLPClassifier:
         if self._model is None:
             raise RuntimeError("Model not fitted. Call fit() first.")
 
-        X = np.asarray(X, dtype=np.float32)
-        X_t = torch.from_numpy(X)
+        # No-op when X is already contiguous float32 (e.g. a scaled buffer)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        X_t = self._to_device(X)
 
-        model = self._model
-        model.eval()
         with torch.no_grad():
-            outputs = model(X_t)
+            outputs = self._forward(X_t)
             proba = torch.softmax(outputs, dim=1)
 
-        return proba.numpy()
+        return proba.cpu().numpy()
@@ -6,28 +6,95 @@ Adapted from interface/backend/app/services/svm_utils.py.
 
 import numpy as np
 import logging
-from typing import Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Tuple, Optional, Union
 
-from sklearn.svm import SVC
-from sklearn.preprocessing import StandardScaler
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.svm import SVC, LinearSVC
 
-from ..models.common import HistogramData
-from ..models.classification import (
-    SimilarityHistogramResponse,
-    CommitteeVoteInfo,
-)
-from ..models.common import HistogramStatistics
+from ..models.classification import CommitteeVoteInfo
+from .constants import WORKER_THREADS
 
 logger = logging.getLogger(__name__)
 
+SCORING_TILE_ROWS = 1024
+# Row-tiled parallel scoring kicks in at this many rows (at least two tiles)
+PARALLEL_SCORING_MIN_ROWS = 2 * SCORING_TILE_ROWS
+# Rows per decision_function call on the non-fused path
+DECISION_CHUNK_ROWS = 4096
+
+# Above this many training rows, exact RBF SVC (O(n^2)-O(n^3) fit) is
+# replaced by a Nystroem feature map + LinearSVC
+APPROX_SVM_MIN_SAMPLES = 10_000
+NYSTROEM_COMPONENTS = 300
+
+_scoring_pool = ThreadPoolExecutor(max_workers=WORKER_THREADS)
+
+
+class _FusedSVMParams(NamedTuple):
+    """Decision-function terms pulled out of a fitted binary SVC."""
+    kernel: str
+    support_vectors: np.ndarray
+    sq_support_vectors: np.ndarray
+    dual_coef: np.ndarray
+    intercept: float
+    gamma: float
+    coef: Optional[np.ndarray]
+
+
+def _attach_fused_params(model: SVC) -> None:
+    """Cache the terms needed for GEMM-based scoring on the fitted model."""
+    if model.kernel not in ("rbf", "linear") or len(model.classes_) != 2:
+        model._fused_params = None
+        return
+    sv = np.ascontiguousarray(model.support_vectors_)
+    dual_coef = model.dual_coef_.ravel()
+    model._fused_params = _FusedSVMParams(
+        kernel=model.kernel,
+        support_vectors=sv,
+        sq_support_vectors=np.einsum("ij,ij->i", sv, sv),
+        dual_coef=dual_coef,
+        intercept=float(model.intercept_[0]),
+        gamma=float(model._gamma),
+        coef=dual_coef @ sv if model.kernel == "linear" else None,
+    )
+
+
+def fit_scaling(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (mean, 1/std) with StandardScaler semantics (zero std -> 1)."""
+    mu = X.mean(axis=0, dtype=np.float64)
+    std = X.std(axis=0, dtype=np.float64)
+    std[std == 0.0] = 1.0
+    return mu, 1.0 / std
+
+
+def scale_features(
+    X: np.ndarray, mu: np.ndarray, inv_std: np.ndarray, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Compute (X - mu) * inv_std, writing into ``out`` when given (X's dtype)."""
+    if out is None:
+        out = np.empty_like(X)
+    np.subtract(X, mu, out=out)
+    np.multiply(out, inv_std, out=out)
+    return out
+
 
 def train_svm_model(
     selected_vectors: np.ndarray,
     rejected_vectors: np.ndarray,
     selected_weights: Optional[np.ndarray] = None,
     rejected_weights: Optional[np.ndarray] = None,
-) -> Tuple[SVC, StandardScaler]:
-    """Train binary SVM classifier with RBF kernel and optional sample weights."""
+) -> Tuple[Union[SVC, Pipeline], Tuple[np.ndarray, np.ndarray]]:
+    """Train binary SVM classifier with RBF kernel and optional sample weights.
+
+    Large training sets use an approximate RBF kernel (Nystroem features +
+    LinearSVC), which fits in linear time.
+
+    Returns the model and the ``(mean, 1/std)`` scaling it was trained in;
+    apply it to new features with ``scale_features``. Feature dtype is
+    passed through unchanged (the metrics matrix is float32).
+    """
     X = np.vstack([selected_vectors, rejected_vectors])
     y = np.array([1] * len(selected_vectors) + [0] * len(rejected_vectors))
 
@@ -37,25 +104,85 @@ def train_svm_model(
         rejected_weights = np.ones(len(rejected_vectors))
     sample_weights = np.concatenate([selected_weights, rejected_weights])
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    mu, inv_std = fit_scaling(X)
+    X_scaled = scale_features(X, mu, inv_std, out=X)
+
+    if len(X_scaled) >= APPROX_SVM_MIN_SAMPLES:
+        # Same gamma as SVC(gamma="scale")
+        X_var = X_scaled.var()
+        gamma = 1.0 / (X_scaled.shape[1] * X_var) if X_var != 0 else 1.0
+        model = make_pipeline(
+            Nystroem(gamma=gamma, n_components=NYSTROEM_COMPONENTS, random_state=42),
+            LinearSVC(C=1.0, class_weight="balanced", dual="auto"),
+        )
+        model.fit(X_scaled, y, linearsvc__sample_weight=sample_weights)
+        logger.info(
+            f"Approximate SVM trained: {len(selected_vectors)} pos, "
+            f"{len(rejected_vectors)} neg, {NYSTROEM_COMPONENTS} Nystroem components"
+        )
+        return model, (mu, inv_std)
 
     model = SVC(kernel="rbf", C=1.0, gamma="scale", class_weight="balanced")
     model.fit(X_scaled, y, sample_weight=sample_weights)
+    _attach_fused_params(model)
 
     logger.info(
         f"SVM trained: {len(selected_vectors)} pos, {len(rejected_vectors)} neg, "
         f"{model.n_support_.sum()} SVs"
     )
-    return model, scaler
-
-
-def score_with_svm(
-    model: SVC, scaler: StandardScaler, feature_vectors: np.ndarray
-) -> np.ndarray:
-    """Score using SVM decision function (positive = selected side)."""
-    X_scaled = scaler.transform(feature_vectors)
-    return model.decision_function(X_scaled)
+    return model, (mu, inv_std)
+
+
+def score_with_svm(model: Union[SVC, Pipeline], X_scaled: np.ndarray) -> np.ndarray:
+    """Score standardized features with the SVM decision function (positive = selected side).
+
+    ``X_scaled`` must already be transformed with the scaling returned by
+    ``train_svm_model``. For RBF/linear kernels ||x - sv||^2 is expanded so
+    the kernel is one GEMM against the support vectors, matching
+    ``model.decision_function`` up to rounding. Approximate (Nystroem)
+    models score through their pipeline, which is two BLAS matmuls.
+    """
+    params = getattr(model, "_fused_params", None)
+    if params is None:
+        # Chunked so the kernel / feature-map intermediates stay bounded
+        scores = np.empty(len(X_scaled), dtype=np.float64)
+        for start in range(0, len(X_scaled), DECISION_CHUNK_ROWS):
+            stop = start + DECISION_CHUNK_ROWS
+            scores[start:stop] = model.decision_function(X_scaled[start:stop])
+        return scores
+
+    if params.kernel == "linear":
+        return X_scaled @ params.coef + params.intercept
+
+    n_rows = len(X_scaled)
+    if n_rows < PARALLEL_SCORING_MIN_ROWS:
+        return _rbf_scores(X_scaled, params)
+
+    # NumPy releases the GIL in GEMM/exp, so tiles run concurrently. BLAS
+    # threads are capped once per process at startup (OMP_NUM_THREADS), not
+    # here: threadpoolctl limits are process-global and would race across
+    # concurrent requests.
+    scores = np.empty(n_rows, dtype=np.float64)
+
+    def _score_tile(start: int) -> None:
+        stop = start + SCORING_TILE_ROWS
+        scores[start:stop] = _rbf_scores(X_scaled[start:stop], params)
+
+    list(_scoring_pool.map(_score_tile, range(0, n_rows, SCORING_TILE_ROWS)))
+    return scores
+
+
+def _rbf_scores(X_scaled: np.ndarray, params: _FusedSVMParams) -> np.ndarray:
+    """RBF decision values for standardized rows via the expanded distance."""
+    sq_x = np.einsum("ij,ij->i", X_scaled, X_scaled)
+    d2 = X_scaled @ params.support_vectors.T
+    d2 *= -2.0
+    d2 += sq_x[:, np.newaxis]
+    d2 += params.sq_support_vectors[np.newaxis, :]
+    np.maximum(d2, 0.0, out=d2)
+    d2 *= -params.gamma
+    kernel = np.exp(d2, out=d2)
+    return kernel @ params.dual_coef + params.intercept
 
 
 def build_similarity_histogram_response(
@@ -63,32 +190,58 @@ def build_similarity_histogram_response(
     score_values: np.ndarray,
     total_items: int,
     committee_votes: Optional[Dict[str, CommitteeVoteInfo]] = None,
-) -> SimilarityHistogramResponse:
-    """Build histogram response from raw scores."""
-    if len(score_values) == 0:
-        return SimilarityHistogramResponse(
-            scores={},
-            histogram=HistogramData(bins=[], counts=[], bin_edges=[]),
-            statistics=HistogramStatistics(min=0.0, max=0.0, mean=0.0, median=0.0),
-            total_items=0,
-        )
+) -> Dict[str, Any]:
+    """Build histogram response from raw scores.
 
-    counts, bin_edges = np.histogram(score_values, bins=60)
+    Returns a plain dict shaped like ``SimilarityHistogramResponse`` so the
+    endpoint can hand it straight to orjson without model validation.
+    """
+    if len(score_values) == 0:
+        return {
+            "scores": {},
+            "histogram": {"bins": [], "counts": [], "bin_edges": []},
+            "statistics": {"min": 0.0, "max": 0.0, "mean": 0.0, "median": 0.0},
+            "total_items": 0,
+            "committee_votes": None,
+        }
+
+    # min/max and bin edges stay on the float64 grid of the returned scores so
+    # the extreme scores sit exactly on the outer edges (the frontend clamps
+    # thresholds to them); float32 rounding could push them outside the range
+    scores64 = np.asarray(score_values, dtype=np.float64)
+    score_min = scores64.min()
+    score_max = scores64.max()
+
+    # Explicit range skips np.histogram's own min/max scan
+    counts, bin_edges = np.histogram(scores64, bins=60, range=(score_min, score_max))
     bins = (bin_edges[:-1] + bin_edges[1:]) / 2
-
-    statistics = HistogramStatistics(
-        min=float(np.min(score_values)),
-        max=float(np.max(score_values)),
-        mean=float(np.mean(score_values)),
-        median=float(np.median(score_values)),
-    )
-
-    return SimilarityHistogramResponse(
-        scores=scores_dict,
-        histogram=HistogramData(
-            bins=bins.tolist(), counts=counts.tolist(), bin_edges=bin_edges.tolist()
-        ),
-        statistics=statistics,
-        total_items=total_items,
-        committee_votes=committee_votes,
-    )
+    score_min, score_max = float(score_min), float(score_max)
+
+    # float32 is ample for the mean/median and halves the bandwidth
+    score_values = np.ascontiguousarray(score_values, dtype=np.float32)
+
+    # Median via O(n) selection instead of np.median's full sort
+    n = len(score_values)
+    k = n // 2
+    if n % 2:
+        median = float(np.partition(score_values, k)[k])
+    else:
+        parted = np.partition(score_values, (k - 1, k))
+        median = float((parted[k - 1] + parted[k]) / 2)
+
+    statistics = {
+        "min": score_min,
+        "max": score_max,
+        "mean": float(score_values.mean()),
+        "median": median,
+    }
+
+    return {
+        "scores": scores_dict,
+        "histogram": {
+            "bins": bins.tolist(), "counts": counts.tolist(), "bin_edges": bin_edges.tolist(),
+        },
+        "statistics": statistics,
+        "total_items": total_items,
+        "committee_votes": committee_votes,
+    }
@@ -4,6 +4,7 @@
 import uvicorn
 import argparse
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -26,6 +27,10 @@ def main():
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=8004)
     parser.add_argument("--reload", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (ignored with --reload)")
+    parser.add_argument("--blas-threads", type=int, default=None,
+                        help="BLAS/OpenMP threads per worker (default: CPU count / workers)")
     parser.add_argument("--log-level", default="info",
                         choices=["debug", "info", "warning", "error"])
     args = parser.parse_args()
@@ -42,7 +47,15 @@ def main():
         if resp.lower() != "y":
             sys.exit(1)
 
-    print(f"\nStarting Code Authorship Classifier API on port {args.port}")
+    workers = 1 if args.reload else args.workers
+    # Workers inherit this env; split the cores between processes so the
+    # per-worker BLAS/torch, executor, RF and numba pools don't oversubscribe
+    worker_threads = str(max(1, (os.cpu_count() or 1) // workers))
+    os.environ.setdefault("OMP_NUM_THREADS", str(args.blas_threads or worker_threads))
+    os.environ.setdefault("WORKER_THREADS", worker_threads)
+    os.environ.setdefault("NUMBA_NUM_THREADS", worker_threads)
+
+    print(f"\nStarting Code Authorship Classifier API on port {args.port} ({workers} workers)")
     print(f"Docs: http://localhost:{args.port}/docs")
 
     uvicorn.run(
@@ -50,6 +63,7 @@ def main():
         host=args.host,
         port=args.port,
         reload=args.reload,
+        workers=workers,
         reload_dirs=["."],
         reload_excludes=["**/*.log", "__pycache__", ".git"],
         log_level=args.log_level.lower(),
@@ -4,7 +4,6 @@
 import polars as pl
 import numpy as np
 from pathlib import Path
-import random
 
 LANGUAGES = ["python", "javascript", "typescript", "rust", "go"]
 BLOCK_TYPES = ["function", "class", "method", "module"]
@@ -38,48 +37,84 @@ METRIC_COLUMNS = [
     "nesting_depth",
 ]
 
+# zstd for smaller files; row groups + statistics let readers skip
+# row groups on block_id range predicates
+PARQUET_WRITE_OPTIONS = dict(
+    compression="zstd",
+    compression_level=3,
+    row_group_size=16384,
+    statistics=True,
+)
+
 
 def generate_mock_data(n_blocks: int = 500, seed: int = 42):
     """Generate mock blocks.parquet and metrics.parquet."""
     rng = np.random.default_rng(seed)
-    random.seed(seed)
 
     output_dir = Path(__file__).parent.parent / "data" / "output"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Generate blocks
-    blocks = []
-    for i in range(n_blocks):
-        lang = random.choice(LANGUAGES)
-        block_type = random.choice(BLOCK_TYPES)
+    # Flat snippet table with per-language offsets, so a snippet can be
+    # drawn for every block with array indexing instead of a Python loop
+    snippet_table, snippet_offsets, snippet_counts = [], [], []
+    for lang in LANGUAGES:
         snippets = MOCK_CODE_SNIPPETS.get(lang, MOCK_CODE_SNIPPETS["python"])
-        code = random.choice(snippets)
-        start_line = rng.integers(1, 500)
-        n_lines = code.count("\n") + 1
+        snippet_offsets.append(len(snippet_table))
+        snippet_counts.append(len(snippets))
+        snippet_table.extend(snippets)
 
-        blocks.append({
-            "block_id": i,
-            "file_id": i // 5,
-            "file_path": f"src/{lang}/module_{i // 5}.{lang[:2]}",
-            "block_type": block_type,
-            "block_name": f"{block_type}_{i}",
-            "language": lang,
-            "start_line": int(start_line),
-            "end_line": int(start_line + n_lines),
-            "code": code,
-        })
+    # Generate blocks column-wise
+    block_ids = np.arange(n_blocks)
+    lang_idx = rng.integers(0, len(LANGUAGES), n_blocks)
+    type_idx = rng.integers(0, len(BLOCK_TYPES), n_blocks)
+    code_idx = np.asarray(snippet_offsets)[lang_idx] + (
+        rng.random(n_blocks) * np.asarray(snippet_counts)[lang_idx]
+    ).astype(np.int64)
+    codes = [snippet_table[i] for i in code_idx.tolist()]
+    start_lines = rng.integers(1, 500, n_blocks).astype(np.int32)
+    # Line counts are per snippet, not per block — count once and gather
+    snippet_lines = np.array(
+        [code.count("\n") + 1 for code in snippet_table], dtype=np.int32
+    )
+    n_lines = snippet_lines[code_idx]
 
-    blocks_df = pl.DataFrame(blocks)
-    blocks_df.write_parquet(output_dir / "blocks.parquet")
+    blocks_df = pl.DataFrame({
+        "block_id": block_ids,
+        "file_id": block_ids // 5,
+        "block_type": np.asarray(BLOCK_TYPES)[type_idx],
+        "language": np.asarray(LANGUAGES)[lang_idx],
+        "start_line": start_lines,
+        "end_line": start_lines + n_lines,
+        "code": codes,
+    }).select(
+        "block_id",
+        "file_id",
+        pl.format(
+            "src/{}/module_{}.{}",
+            pl.col("language"), pl.col("file_id"), pl.col("language").str.slice(0, 2),
+        ).alias("file_path"),
+        "block_type",
+        pl.format("{}_{}", pl.col("block_type"), pl.col("block_id")).alias("block_name"),
+        "language",
+        "start_line",
+        "end_line",
+        "code",
+    ).with_columns(
+        # Low-cardinality strings are written as dictionary-encoded pages
+        pl.col("file_path").cast(pl.Categorical),
+        pl.col("language").cast(pl.Categorical),
+        pl.col("block_type").cast(pl.Categorical),
+    )
+    blocks_df.write_parquet(output_dir / "blocks.parquet", **PARQUET_WRITE_OPTIONS)
     print(f"Wrote {len(blocks_df)} blocks to {output_dir / 'blocks.parquet'}")
 
     # Generate metrics
-    metrics_data = {"block_id": list(range(n_blocks))}
-    for col in METRIC_COLUMNS:
-        metrics_data[col] = rng.random(n_blocks).tolist()
-
-    metrics_df = pl.DataFrame(metrics_data)
-    metrics_df.write_parquet(output_dir / "metrics.parquet")
+    metric_values = rng.random((len(METRIC_COLUMNS), n_blocks))
+    metrics_df = pl.DataFrame({
+        "block_id": block_ids,
+        **dict(zip(METRIC_COLUMNS, metric_values)),
+    })
+    metrics_df.write_parquet(output_dir / "metrics.parquet", **PARQUET_WRITE_OPTIONS)
     print(f"Wrote {len(metrics_df)} metric rows to {output_dir / 'metrics.parquet'}")
 
 
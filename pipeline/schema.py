@@ -11,6 +11,8 @@ blocks.parquet columns:
     start_line (int)     — first line in file
     end_line (int)       — last line in file
     code (str)           — raw source code text
+    file_path, block_type and language may be stored as categorical
+    (dictionary-encoded) strings.
 
 metrics.parquet columns:
     block_id (int)       — foreign key to blocks